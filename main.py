@@ -1,150 +1,326 @@
 import random
 import math
 
+import numpy as np
+
+try:
+    from numba import njit
+    _HAS_NUMBA = True
+except ImportError:  # numba is optional, the kernels then run as plain Python
+    _HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+# Largest magnitude we let int64 arrays hold; anything bigger stays as Python ints
+_INT64_LIMIT = np.iinfo(np.int64).max
+
+# Shared generator for the batched key generation draws. Like the random module it is not a cryptographically
+# secure source: real keys should be drawn with the secrets module instead
+_rng = np.random.default_rng()
+
+
+def _as_int_array(values):
+    """
+    Converts a key sequence to an int64 array, falling back to an object array (arbitrary precision Python ints)
+    when a dot product over it could overflow int64.
+    """
+    values = list(values)
+    if values and max(abs(int(v)) for v in values) * len(values) > _INT64_LIMIT:
+        return np.array(values, dtype=object)
+    return np.asarray(values, dtype=np.int64)
+
+
+@njit(cache=True, boundscheck=False)
+def _subset_sum(w, c, out):
+    """
+    Greedy subset sum over the superincreasing sequence w, writing the chosen elements as 1 bits into out.
+    """
+    for i in range(w.shape[0] - 1, -1, -1):
+        if c >= w[i]:
+            out[i] = 1
+            c -= w[i]
+        else:
+            out[i] = 0
+
+
+@njit(cache=True, boundscheck=False)
+def _decode_blocks(c_primes, w, out):
+    """
+    Runs the greedy subset sum for every block value c_prime, writing the bits of block b into
+    out[b * n:(b + 1) * n].
+    """
+    n = w.shape[0]
+    for b in range(c_primes.shape[0]):
+        _subset_sum(w, c_primes[b], out[b * n:(b + 1) * n])
+
+
+@njit(cache=True, boundscheck=False)
+def _encode_blocks(packed, table, out):
+    """
+    Sums, for every block of packed bytes, the byte lookup table entries selected by its bytes.
+    """
+    for b in range(packed.shape[0]):
+        block_sum = 0
+        for p in range(packed.shape[1]):
+            block_sum += table[p, packed[b, p]]
+        out[b] = block_sum
+
+
+@njit(cache=True)
+def _superincreasing(deltas, out):
+    """
+    Fills out with the superincreasing sequence where each element exceeds the sum of the previous ones by
+    the matching delta, returning the total sum.
+    """
+    total = 0
+    for i in range(deltas.shape[0]):
+        out[i] = total + deltas[i]
+        total += out[i]
+    return total
+
+
+_warmed_up = False
+
+
+def _warm_up():
+    """
+    Calls the jitted kernels once so their compilation isn't paid on the first real encryption/decryption. Only
+    does anything the first time, and only when numba is installed.
+    """
+    global _warmed_up
+    if not _HAS_NUMBA or _warmed_up:
+        return
+    _warmed_up = True
+
+    w = np.ones(1, dtype=np.int64)
+    _subset_sum(w, 0, np.zeros(1, dtype=np.uint8))
+    _decode_blocks(w, w, np.zeros(1, dtype=np.uint8))
+    _encode_blocks(np.zeros((1, 1), dtype=np.uint8), np.zeros((1, 256), dtype=np.int64),
+                   np.zeros(1, dtype=np.int64))
+
 
 class KnapsackCrypto:
     def __init__(self):
         self.alphabet = " " + "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
         self.char_to_int = {char: i for i, char in enumerate(self.alphabet)}
-        self.int_to_char = {i: char for i, char in enumerate(self.alphabet)}
+        # Values are the contiguous positions in the alphabet, so indexing the alphabet itself maps them back
+        self.int_to_char = self.alphabet
+        # The same map as ASCII codes, so decoded values map to the message bytes in one indexing step
+        self._int_to_char_bytes = np.frombuffer(self.int_to_char.encode('ascii'), dtype=np.uint8)
         self.block_size = 0  # Will be set during key gen
 
-    def _generate_superincreasing(self, n):
+        # Byte lookup table of the last public key used for encryption (see _byte_table)
+        self._table_key = None
+        self._table = None
+
+        # Lookup table indexed by ASCII code, 255 marks characters outside the alphabet. Lowercase letters map
+        # to the same values as uppercase ones, so the text never needs to be uppercased
+        self._char_lut = np.full(256, 255, dtype=np.uint8)
+        for char, i in self.char_to_int.items():
+            self._char_lut[ord(char)] = i
+            self._char_lut[ord(char.lower())] = i
+        # The same table as a bytes.translate table, so the whole text is mapped in a single C pass
+        self._code_table = self._char_lut.tobytes()
+
+    def _generate_superincreasing(self, n, np_rng=_rng):
         """
-        Generates a superincreasing sequence of length n.
+        Generates a superincreasing sequence of length n, drawing the increments from the NumPy generator np_rng.
         """
-        w = []
-        current_sum = 0
-        for _ in range(n):
-            next_val = random.randint(current_sum + 1, current_sum + 100)
-            w.append(next_val)
-            current_sum += next_val
-        return w, current_sum
-
-    def generate_keys(self, n=10):
+        deltas = np_rng.integers(1, 101, size=n, dtype=np.int64)
+
+        # The total sum stays below 100 * 2^n, past that the sequence needs Python's arbitrary precision ints
+        if 100 * 2 ** n <= _INT64_LIMIT:
+            w = np.empty(n, dtype=np.int64)
+            current_sum = _superincreasing(deltas, w)
+        else:
+            w = np.empty(n, dtype=object)
+            current_sum = getattr(_superincreasing, 'py_func', _superincreasing)(deltas.astype(object), w)
+        return w.tolist(), int(current_sum)
+
+    def _draw_multiplier(self, q, py_rng=random):
+        """Draws a candidate multiplier r in [2, q - 1], odd when q is even."""
+        r = py_rng.randint(2, q - 1)
+        if q % 2 == 0:
+            # q - 1 is odd, so r | 1 stays below q
+            r |= 1
+        return r
+
+    def generate_keys(self, n=10, seed=None):
         """
         n is The length of the key (number of items in the knapsack).
            Ideally a multiple of 5 (since 1 char = 5 bits).
            Defaulting to 10 (2 chars at a time).
+        seed makes the keys reproducible: the same seed always gives the same keys. Without it the draws come
+           from the module's shared NumPy generator and the random module, so random.seed alone no longer
+           reproduces them.
         """
         self.block_size = n
 
+        if seed is None:
+            py_rng, np_rng = random, _rng
+        else:
+            py_rng, np_rng = random.Random(seed), np.random.default_rng(seed)
+
         # 1. Generate Private Key part: Superincreasing sequence (w)
-        w, total_sum = self._generate_superincreasing(n)
+        w, total_sum = self._generate_superincreasing(n, np_rng)
 
         # 2. Choose Modulus (q) such that q > sum(w)
-        q = random.randint(total_sum + 1, total_sum + 500)
+        q = py_rng.randint(total_sum + 1, total_sum + 500)
 
         # 3. Choose Multiplier (r) such that gcd(r, q) = 1 (coprime)
-        r = random.randint(2, q - 1)
+        # When q is even, r is forced to be odd, which rules out the most common shared factor so the first draw
+        # is usually coprime. The loop stays as a fallback for the odd factors of q
+        r = self._draw_multiplier(q, py_rng)
         while math.gcd(r, q) != 1:
-            r = random.randint(2, q - 1)
+            r = self._draw_multiplier(q, py_rng)
 
         # 4. Calculate Public Key (beta)
         # beta = (w * r) mod q
         beta = [(val * r) % q for val in w]
 
+        # 5. Precompute the decryption material: the modular inverse of r modulo q and w as an array
+        r_prime = pow(r, -1, q)
+
         public_key = beta
-        private_key = (w, q, r)
+        private_key = (w, q, r, r_prime, _as_int_array(w))
+
+        # Compile the kernels on the first key generation rather than on the first encrypt/decrypt call
+        _warm_up()
 
         return public_key, private_key
 
     def _text_to_bits(self, plaintext):
-        """Converts text to a binary string based on 27-char alphabet."""
-        bit_string = ""
-        for char in plaintext.upper():
-            if char not in self.char_to_int:
-                raise ValueError(f"Invalid character found: '{char}'")
-
-            val = self.char_to_int[char]
-            # Convert to 5-bit binary (27 chars needs 5 bits)
-            # 0 becomes '00000', 1 becomes '00001', etc.
-            binary = format(val, '05b')
-            bit_string += binary
-        return bit_string
+        """Converts text to an array of bits based on 27-char alphabet."""
+        # Uppercasing, validation and conversion to values all happen in one translate pass over the bytes
+        try:
+            codes = plaintext.encode('ascii').translate(self._code_table)
+        except UnicodeEncodeError as e:
+            raise ValueError(f"Invalid character found: '{e.object[e.start]}'") from None
+
+        vals = np.frombuffer(codes, dtype=np.uint8)
+        if (vals == 255).any():
+            bad = plaintext[int(np.argmax(vals == 255))]
+            raise ValueError(f"Invalid character found: '{bad}'")
+
+        # Keep the low 5 bits of each value (27 chars needs 5 bits)
+        # 0 becomes 00000, 1 becomes 00001, etc.
+        bits = np.unpackbits(vals[:, None], axis=1)[:, 3:]
+        return bits.ravel()
+
+    def _byte_table(self, public_key):
+        """
+        Builds (or reuses) the lookup table of the public key where table[p][byte] is the sum of the public key
+        values selected by the bits of byte at byte position p of a block.
+        """
+        # Comparing two lists runs in C without building a new object, so a list key is checked as is
+        key = public_key if isinstance(public_key, list) else list(public_key)
+        if self._table_key != key:
+            public_key_np = _as_int_array(public_key)
+            # Pad the key with 0s up to a whole number of bytes
+            num_bytes = -(-len(public_key_np) // 8)
+            padded = np.zeros(num_bytes * 8, dtype=public_key_np.dtype)
+            padded[:len(public_key_np)] = public_key_np
+
+            # Bits of every byte value, most significant first to match np.packbits
+            byte_bits = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).astype(padded.dtype)
+            self._table = padded.reshape(num_bytes, 8) @ byte_bits.T
+            self._table_key = list(key)
+        return self._table
 
     def encrypt(self, plaintext, public_key):
         """
         Using the public key, encrypts a given plaintext.
         """
-        # 1. Validation
-        if not all(c in self.alphabet for c in plaintext.upper()):
-            raise ValueError("Plaintext contains characters not in the defined alphabet.")
-
         n = len(public_key)
 
-        # 2. Convert text to bits
-        bit_string = self._text_to_bits(plaintext)
+        # 1. Validate and convert text to bits
+        bits = self._text_to_bits(plaintext)
 
-        # 3. Pad the bit string if it doesn't fit the key length perfectly
-        remainder = len(bit_string) % n
-        if remainder != 0:
-            padding_needed = n - remainder
-            # Pad with 0s (which maps to Space in our logic, so it's safe)
-            bit_string += '0' * padding_needed
+        # 2. Lay the bits out as a (num_blocks, n) matrix, one block per row. The matrix starts as 0s, so a
+        # last block that doesn't fit the key length perfectly is padded with 0s (which maps to Space in our
+        # logic, so it's safe)
+        num_blocks = -(-len(bits) // n)
+        blocks = np.zeros((num_blocks, n), dtype=np.uint8)
+        blocks.ravel()[:len(bits)] = bits
 
-        # 4. Encrypt blocks
-        ciphertext_blocks = []
+        # 3. Encrypt all blocks at once: each block is packed into bytes, and the sum of the public key values
+        # selected by each byte is read from the lookup table for that byte's position
+        table = self._byte_table(public_key)
+        packed = np.packbits(blocks, axis=1)
+        if _HAS_NUMBA and table.dtype == np.int64:
+            ciphertext = np.empty(num_blocks, dtype=np.int64)
+            _encode_blocks(packed, table, ciphertext)
+        else:
+            ciphertext = table[np.arange(packed.shape[1]), packed].sum(axis=1)
 
-        # Process the bit string in chunks of size n
-        for i in range(0, len(bit_string), n):
-            chunk = bit_string[i:i + n]
-
-            # Calculate Dot Product: sum(bit * public_key_val)
-            block_sum = 0
-            for bit_index, bit in enumerate(chunk):
-                if bit == '1':
-                    block_sum += public_key[bit_index]
-
-            ciphertext_blocks.append(block_sum)
-
-        return ciphertext_blocks
+        return ciphertext.tolist()
 
     def subset_sum_problem(self, w, c_prime):
         """
-        Greedy algorithm that obtains a string of bits, with the 1 bits representing the largest elements of the
+        Greedy algorithm that obtains an array of bits, with the 1 bits representing the largest elements of the
         superincreasing sequence w that sum up to c_prime.
         """
-        bit_result = ''
-
-        # Since w is a superincreasing sequence, the list is reversed to obtain the largest elements first
-        for w_element in reversed(w):
-            if c_prime - w_element >= 0:
-                bit_result = '1' + bit_result
-                c_prime -= w_element
-            else:
-                bit_result = '0' + bit_result
-            # The list is reversed, so we add the bits to the front of the bit_result string
-        return bit_result
+        if not isinstance(w, np.ndarray):
+            w = _as_int_array(w)
+        bits = np.zeros(len(w), dtype=np.uint8)
+
+        # Since w is a superincreasing sequence, we go from the last element to the first to take the largest
+        # elements first, writing each bit into its position from the right
+        if w.dtype == np.int64 and c_prime <= _INT64_LIMIT:
+            _subset_sum(w, c_prime, bits)
+        else:
+            # Values too large for int64 can't go through the jitted kernel
+            getattr(_subset_sum, 'py_func', _subset_sum)(w, c_prime, bits)
+        return bits
 
     def decrypt(self, ciphertext, private_key):
         """
         Using the private key, decrypts the ciphertext
         """
-        w, q, r = private_key
+        if len(private_key) == 3:
+            # Key without the precomputed values, calculate the modular inverse of r modulo q here
+            w, q, r = private_key
+            r_prime = pow(r, -1, q)
+            w_arr = _as_int_array(w)
+        else:
+            # 1. The modular inverse of r modulo q is precomputed in the private key
+            w, q, r, r_prime, w_arr = private_key
+
+        n = len(w_arr)
+        # A trailing partial chunk of 5 can only come from the encryption padding, so the bits are allocated
+        # with enough extra 0s to complete it
+        num_bits = len(ciphertext) * n
+        bits = np.zeros(num_bits + (-num_bits % 5), dtype=np.uint8)
+
+        if w_arr.dtype == np.int64 and q <= _INT64_LIMIT:
+            # 2. For each block in the cyphertext, calculate c * r_prime mod q. Every c_prime is below q, so it
+            # fits in int64, but the product only does while q * q does
+            if q * q <= _INT64_LIMIT:
+                # Reduce c first so the product stays below q * q
+                c_primes = np.asarray(ciphertext, dtype=np.int64) % q * r_prime % q
+            else:
+                c_primes = np.array([(block * r_prime) % q for block in ciphertext], dtype=np.int64)
 
-        # 1. Calculate the modular inverse of the modular inverse of r modulo q
-        r_prime = pow(r, -1, q)
+            # 3. For each block, we resolve the subset sum problem using the superincreasing sequence w, all
+            # blocks at once in the jitted kernel
+            _decode_blocks(c_primes, w_arr, bits)
+        else:
+            for i, ciphertext_block in enumerate(ciphertext):
+                # 2. For each block in the cyphertext, calculate c * r_prime mod q
+                c_prime = (ciphertext_block * r_prime) % q
+
+                # 3. For each block, we resolve the subset sum problem using the superincreasing sequence w,
+                # and add its result to the binary message
+                bits[i * n:(i + 1) * n] = self.subset_sum_problem(w_arr, c_prime)
+
+        # 4. We reconstruct the original message by splitting the binary message into chunks of 5
+        # (since 27 characters need 5 bits), and attributing them a character from the defined alphabet
+        vals = bits.reshape(-1, 5) @ np.array([16, 8, 4, 2, 1], dtype=np.uint8)
 
-        bit_string = ''
-        for ciphertext_block in ciphertext:
-            # 2. For each block in the cyphertext, calculate c * r_prime mod q
-            c_prime = (ciphertext_block * r_prime) % q
-
-            # 3. For each block, we resolve the subset sum problem using the superincreasing sequence w,
-            # and add its result to the binary message string
-            string_result = self.subset_sum_problem(w, c_prime)
-            bit_string += string_result
-
-        decrypted = ''
-        for i in range(0, len(bit_string), 5):
-            # 4. We reconstruct the original message by splitting the binary message string into chunks of 5
-            # (since 27 characters need 5 bits), and attributing them a character from the defined alphabet
-            chunk = ''.join(map(str, bit_string[i:i + 5]))
-            chunk_integer = int(chunk, 2)
-            decrypted += self.int_to_char[chunk_integer]
-
-        return decrypted
+        return self._int_to_char_bytes[vals].tobytes().decode('ascii')
 
 
 # example use for testing